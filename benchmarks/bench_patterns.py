@@ -0,0 +1,307 @@
+# Benchmarks for the hot path of every design pattern example.
+#
+# Each benchmark is registered with the workload sizes it runs at (object counts, subscriber counts,
+# records per file). A benchmark function does its setup for one size and returns the callable to time.
+# per_item_ns divides by the number of items one run processes, which is the size unless the benchmark
+# registers an `items` function (e.g. thread count -> total calls).
+#
+# Usage:
+#   python benchmarks/bench_patterns.py --output baseline.json
+#   python benchmarks/bench_patterns.py --compare baseline.json --threshold 0.10
+
+import argparse
+import contextlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+PATTERNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src", "3.design-patterns")
+
+BENCHMARKS = {}
+_modules = {}
+_workdir = tempfile.TemporaryDirectory(prefix="pattern-bench-")
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def benchmark(name, sizes, items=None):
+    def register(func):
+        BENCHMARKS[name] = (func, sizes, items)
+        return func
+    return register
+
+
+# The pattern files are standalone scripts with names that are not valid module names, so load them by path
+def load_pattern(file_name):
+    if file_name not in _modules:
+        module_name = "pattern_" + "".join(ch if ch.isalnum() else "_" for ch in os.path.splitext(file_name)[0])
+        path = os.path.join(PATTERNS_DIR, file_name)
+        # An explicit loader is needed for the upper-case .PY extension
+        loader = importlib.machinery.SourceFileLoader(module_name, path)
+        spec = importlib.util.spec_from_file_location(module_name, path, loader=loader)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except ImportError as error:
+            del sys.modules[module_name]
+            raise SkipBenchmark(f"{file_name}: {error}") from None
+        _modules[file_name] = module
+    return _modules[file_name]
+
+
+# Several examples print on every call; send that to /dev/null so the terminal is not what gets measured
+def silenced(func):
+    def run():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            func()
+    return run
+
+
+@benchmark("factory.create_shape", sizes=(1_000, 10_000, 100_000))
+def bench_create_shape(size):
+    factory = load_pattern("3.2-FACTORY_PATTERN.py")
+    shape_factory = factory.ShapeFactory()
+    shape_types = list(factory.ShapeType)
+    contexts = [factory.ShapeContext(random.choice(shape_types), random.randint(0, 800), random.randint(0, 600))
+                for _ in range(size)]
+
+    def run():
+        for context in contexts:
+            shape_factory.create_shape(context)
+    return run
+
+
+@benchmark("observer.notify", sizes=(100, 10_000, 100_000))
+def bench_notify(size):
+    observer = load_pattern("3.6-OBSERVER_PATTERN.py")
+
+    class SilentUser(observer.Observer):
+        def update(self, news):
+            pass
+
+    news_feed = observer.NewsFeed()
+    for _ in range(size):
+        news_feed.attach(SilentUser())
+
+    def run():
+        news_feed.add_news("Breaking News")
+    return run
+
+
+@benchmark("singleton.thread_safe_new", sizes=(10_000, 100_000))
+def bench_thread_safe_singleton(size):
+    singleton = load_pattern("3.1-SINGLETON_PATTERNS.PY")
+    cls = singleton.ThreadSafeSingleton
+
+    def run():
+        for _ in range(size):
+            cls()
+    return run
+
+
+# Contention benchmarks: `size` threads start together and each fetches the singleton CALLS_PER_THREAD times
+CALLS_PER_THREAD = 10_000
+
+
+def _contended(get_instance, threads):
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(CALLS_PER_THREAD):
+            get_instance()
+
+    def run():
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        for thread in workers:
+            thread.join()
+    return run
+
+
+def _contended_calls(threads):
+    return threads * CALLS_PER_THREAD
+
+
+@benchmark("singleton.thread_safe_contended", sizes=(1, 8, 64), items=_contended_calls)
+def bench_thread_safe_contended(size):
+    singleton = load_pattern("3.1-SINGLETON_PATTERNS.PY")
+    return _contended(singleton.ThreadSafeSingleton, size)
+
+
+@benchmark("singleton.fast_meta_contended", sizes=(1, 8, 64), items=_contended_calls)
+def bench_fast_meta_contended(size):
+    singleton = load_pattern("3.1-SINGLETON_PATTERNS.PY")
+    return _contended(singleton.FastSingleton, size)
+
+
+@benchmark("state.document_publish", sizes=(1_000, 10_000, 100_000))
+def bench_document_publish(size):
+    state = load_pattern("3.7-STATE_PATTERN.py")
+
+    # Each document goes Draft -> Moderation -> Draft -> Moderation -> Published
+    def run():
+        for _ in range(size):
+            document = state.Document()
+            document.publish()
+            document.reject()
+            document.publish()
+            document.publish()
+    return silenced(run)
+
+
+@benchmark("strategy.calculate", sizes=(1_000, 10_000, 100_000))
+def bench_calculate(size):
+    strategy = load_pattern("3.5-STRATEGY_PATTERN.py")
+    calculator = strategy.PriceCalculator(strategy.SeasonalDiscountStrategy())
+    prices = [random.uniform(1.0, 500.0) for _ in range(size)]
+
+    def run():
+        for price in prices:
+            calculator.calculate(price)
+    return silenced(run)
+
+
+def _contact_fields(index):
+    return (f"Contact {index}", f"contact{index}@example.com", f"+1 555 {index:07d}", index % 3 == 0)
+
+
+@benchmark("contacts.xml_get_contacts", sizes=(1_000, 10_000, 100_000))
+def bench_xml_contacts(size):
+    contacts = load_pattern("3.4.1.ex2.py")
+    path = os.path.join(_workdir.name, f"contacts-{size}.xml")
+    with open(path, "w") as f:
+        f.write("<contacts>\n")
+        for index in range(size):
+            full_name, email, phone_number, is_friend = _contact_fields(index)
+            f.write(f"<contact><full_name>{full_name}</full_name><email>{email}</email>"
+                    f"<phone_number>{phone_number}</phone_number><is_friend>{str(is_friend).lower()}</is_friend></contact>\n")
+        f.write("</contacts>\n")
+    adapter = contacts.XMLContactsAdapter(contacts.XMLReader(path))
+    return adapter.get_contacts
+
+
+@benchmark("contacts.json_get_contacts", sizes=(1_000, 10_000, 100_000))
+def bench_json_contacts(size):
+    contacts = load_pattern("3.4.1.ex2.py")
+    path = os.path.join(_workdir.name, f"contacts-{size}.json")
+    records = [dict(zip(("full_name", "email", "phone_number", "is_friend"), _contact_fields(index)))
+               for index in range(size)]
+    with open(path, "w") as f:
+        json.dump({"contacts": records}, f)
+    adapter = contacts.JSONContactsAdapter(contacts.JSONReader(path))
+    return adapter.get_contacts
+
+
+def measure(run, warmup, repeat):
+    for _ in range(warmup):
+        run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(names, sizes=None, warmup=1, repeat=5, seed=0):
+    results = []
+    for name in names:
+        func, default_sizes, items = BENCHMARKS[name]
+        for size in sizes or default_sizes:
+            random.seed(seed)
+            try:
+                run = func(size)
+            except SkipBenchmark as reason:
+                print(f"skip  {name}: {reason}", file=sys.stderr)
+                break
+            timings = measure(run, warmup, repeat)
+            median = statistics.median(timings)
+            count = items(size) if items else size
+            result = {
+                "name": name,
+                "size": size,
+                "items": count,
+                "repeat": repeat,
+                "min_s": min(timings),
+                "median_s": median,
+                "mean_s": statistics.fmean(timings),
+                "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "per_item_ns": median / count * 1e9,
+            }
+            results.append(result)
+            print(f"{name:<32} size={size:<8} median={median * 1e3:10.3f} ms  per item={result['per_item_ns']:10.1f} ns",
+                  file=sys.stderr)
+    return results
+
+
+# Compare against an earlier run; a benchmark regresses when its median grows by more than `threshold`
+def compare(results, baseline, threshold):
+    previous = {(result["name"], result["size"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["median_s"] / old["median_s"]
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{result['name']:<32} size={result['size']:<8} {ratio:6.2f}x {marker}", file=sys.stderr)
+        if marker:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of the design pattern examples.")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--sizes", help="comma-separated workload sizes overriding each benchmark's defaults")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per workload size")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for generated workloads")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else None
+    results = run_benchmarks(names, sizes, args.warmup, args.repeat, args.seed)
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "warmup": args.warmup,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,23 @@
 # FACTORY PATTERN: IS A creational design pattern that provides an interface for creating objects in a superclass,
 # but allows subclasses to alter the type of objects that will be created.
 
+import argparse
+import bisect
+import json
+import math
+import os
+import time
 import pygame
 import random
+from collections import defaultdict
 from abc import ABC, abstractmethod
 from enum import Enum, auto
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only ShapeStore needs it
+    np = None
+
 class ShapeType(Enum):
     CIRCLE = auto()
     RECTANGLE = auto()
@@ -21,6 +33,14 @@ class Shape(ABC):
     def draw(self):
         pass
 
+    # Axis-aligned bounding box, used by the spatial index
+    @abstractmethod
+    def bounds(self):
+        pass
+
+    def contains_point(self, px, py):
+        return self.bounds().collidepoint(px, py)
+
 class Circle(Shape):
     def __init__(self, x, y):
         super().__init__(x, y)
@@ -28,7 +48,13 @@ class Circle(Shape):
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
     def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
+        return pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
+
+    def bounds(self):
+        return pygame.Rect(self.x - self.radius, self.y - self.radius, 2 * self.radius, 2 * self.radius)
+
+    def contains_point(self, px, py):
+        return (px - self.x) ** 2 + (py - self.y) ** 2 <= self.radius ** 2
 
 class Rectangle(Shape):
     def __init__(self, x, y):
@@ -38,7 +64,10 @@ class Rectangle(Shape):
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
     def draw(self, screen):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+        return pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+
+    def bounds(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
 
 class Triangle(Shape):
     def __init__(self, x, y):
@@ -48,7 +77,18 @@ class Triangle(Shape):
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
     def draw(self, screen):
-        pygame.draw.polygon(screen, self.color, [(self.x, self.y), (self.x + self.width, self.y), (self.x + self.width / 2, self.y + self.height)])
+        return pygame.draw.polygon(screen, self.color, [(self.x, self.y), (self.x + self.width, self.y), (self.x + self.width / 2, self.y + self.height)])
+
+    def bounds(self):
+        return pygame.Rect(self.x, self.y, self.width + 1, self.height + 1)
+
+    def contains_point(self, px, py):
+        # Inside when below the top edge and between the two slanted edges at that height
+        if not 0 <= py - self.y <= self.height:
+            return False
+        half_width = self.width / 2 * (1 - (py - self.y) / self.height)
+        center = self.x + self.width / 2
+        return center - half_width <= px <= center + half_width
 
 class ShapeContext:
     def __init__(self, shape_type, x, y):
@@ -56,54 +96,388 @@ class ShapeContext:
         self.x = x
         self.y = y
 
+# Spatial index: a uniform grid of cells, each listing the shapes whose bounding box overlaps it.
+# Point, rectangle and viewport queries only look at the cells they cover instead of scanning every shape.
+# Results come back in creation order, which is also the drawing order.
+class SpatialGrid:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        self._entries = {}  # id(shape) -> (creation order, shape, bounds)
+        self._next_order = 0
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cx, cy
+
+    def insert(self, shape):
+        entry = (self._next_order, shape, shape.bounds())
+        self._next_order += 1
+        self._entries[id(shape)] = entry
+        for cell in self._cells_for(entry[2]):
+            self._cells[cell].append(entry)
+
+    def remove(self, shape):
+        entry = self._entries.pop(id(shape))
+        for cell in self._cells_for(entry[2]):
+            entries = self._cells[cell]
+            entries.remove(entry)
+            if not entries:
+                del self._cells[cell]
+
+    def query_rect(self, rect):
+        rect = pygame.Rect(rect)
+        found = {}
+        for cell in self._cells_for(rect):
+            for entry in self._cells.get(cell, ()):
+                if entry[0] not in found and entry[2].colliderect(rect):
+                    found[entry[0]] = entry[1]
+        return [found[order] for order in sorted(found)]
+
+    # Everything visible on a screen or camera rectangle
+    def query_viewport(self, viewport):
+        return self.query_rect(viewport)
+
+    # Shapes under a point, bottom-most first; the last one is drawn on top
+    def query_point(self, px, py):
+        cell = (px // self.cell_size, py // self.cell_size)
+        hits = [entry for entry in self._cells.get(cell, ()) if entry[1].contains_point(px, py)]
+        return [entry[1] for entry in sorted(hits, key=lambda entry: entry[0])]
+
+    def __len__(self):
+        return len(self._entries)
+
 class ShapeFactory:
+    # When given a spatial index, every created shape is registered in it
+    def __init__(self, index=None):
+        self.index = index
+
     def create_shape(self, context):
         if context.shape_type == ShapeType.CIRCLE:
-            return Circle(context.x, context.y)
+            shape = Circle(context.x, context.y)
         elif context.shape_type == ShapeType.RECTANGLE:
-            return Rectangle(context.x, context.y)
+            shape = Rectangle(context.x, context.y)
         elif context.shape_type == ShapeType.TRIANGLE:
-            return Triangle(context.x, context.y)
+            shape = Triangle(context.x, context.y)
         else:
             raise ValueError("Invalid shape type")
+        if self.index is not None:
+            self.index.insert(shape)
+        return shape
+
+    # Bulk creation into a ShapeStore: no Shape object is created per shape
+    def create_bulk(self, store, shape_type, xs, ys):
+        if shape_type not in ShapeType:
+            raise ValueError("Invalid shape type")
+        return store.add_many(shape_type, xs, ys)
+
+# Array-backed shape storage (structure of arrays) for scenes with millions of shapes.
+# Shapes of each ShapeType live in one NumPy structured array that grows by doubling; circles store their
+# diameter in width/height. Drawing is batched per type: the arrays are converted to Python values in
+# one go and drawn in a tight loop with no per-object method dispatch. Types are drawn one after the other
+# (rectangles, triangles, then circles), so overlaps between different types follow that order.
+SHAPE_DTYPE = [('x', 'i4'), ('y', 'i4'), ('width', 'i2'), ('height', 'i2'), ('color', 'u1', (3,))]
+
+class ShapeStore:
+    def __init__(self, capacity=1024, seed=None):
+        if np is None:
+            raise RuntimeError("ShapeStore requires NumPy")
+        self._arrays = {shape_type: np.empty(capacity, dtype=SHAPE_DTYPE) for shape_type in ShapeType}
+        self._sizes = {shape_type: 0 for shape_type in ShapeType}
+        self._rng = np.random.default_rng(seed)
+
+    def _reserve(self, shape_type, count):
+        array = self._arrays[shape_type]
+        needed = self._sizes[shape_type] + count
+        if needed > len(array):
+            grown = np.empty(max(needed, 2 * len(array)), dtype=SHAPE_DTYPE)
+            grown[:self._sizes[shape_type]] = array[:self._sizes[shape_type]]
+            self._arrays[shape_type] = grown
+        start = self._sizes[shape_type]
+        self._sizes[shape_type] = needed
+        return self._arrays[shape_type][start:needed]
+
+    # Append shapes at the given positions with random sizes and colors, using the same ranges as the Shape classes
+    def add_many(self, shape_type, xs, ys):
+        xs = np.asarray(xs, dtype=np.int32)
+        rows = self._reserve(shape_type, len(xs))
+        rows['x'] = xs
+        rows['y'] = ys
+        if shape_type == ShapeType.CIRCLE:
+            diameter = 2 * self._rng.integers(10, 51, len(xs))
+            rows['width'] = diameter
+            rows['height'] = diameter
+        else:
+            rows['width'] = self._rng.integers(20, 101, len(xs))
+            rows['height'] = self._rng.integers(20, 101, len(xs))
+        rows['color'] = self._rng.integers(0, 256, (len(xs), 3))
+        return rows
+
+    # Append existing Shape objects
+    def add(self, shape):
+        if isinstance(shape, Circle):
+            shape_type, width, height = ShapeType.CIRCLE, 2 * shape.radius, 2 * shape.radius
+        elif isinstance(shape, Rectangle):
+            shape_type, width, height = ShapeType.RECTANGLE, shape.width, shape.height
+        else:
+            shape_type, width, height = ShapeType.TRIANGLE, shape.width, shape.height
+        self._reserve(shape_type, 1)[0] = (shape.x, shape.y, width, height, shape.color)
+
+    def view(self, shape_type):
+        return self._arrays[shape_type][:self._sizes[shape_type]]
+
+    def __len__(self):
+        return sum(self._sizes.values())
+
+    # Rectangles stay on one Surface.fill call each: rasterizing them in bulk through surfarray.pixels3d
+    # (last writer per pixel) costs per covered pixel and measured 5-8x slower than the C fill calls
+    def draw(self, surface):
+        rects = self.view(ShapeType.RECTANGLE)
+        fill = surface.fill
+        for x, y, width, height, color in zip(rects['x'].tolist(), rects['y'].tolist(), rects['width'].tolist(),
+                                               rects['height'].tolist(), map(tuple, rects['color'].tolist())):
+            fill(color, (x, y, width, height))
+
+        # Triangle vertices are computed for the whole batch at once
+        triangles = self.view(ShapeType.TRIANGLE)
+        x, y = triangles['x'].astype(np.float64), triangles['y'].astype(np.float64)
+        width, height = triangles['width'], triangles['height']
+        vertices = np.stack([x, y, x + width, y, x + width / 2, y + height], axis=1).reshape(-1, 3, 2).tolist()
+        polygon = pygame.draw.polygon
+        for points, color in zip(vertices, map(tuple, triangles['color'].tolist())):
+            polygon(surface, color, points)
+
+        circles = self.view(ShapeType.CIRCLE)
+        circle = pygame.draw.circle
+        for center, radius, color in zip(np.stack([circles['x'], circles['y']], axis=1).tolist(),
+                                         (circles['width'] // 2).tolist(), map(tuple, circles['color'].tolist())):
+            circle(surface, color, center, radius)
+
+# Cached layer rendering
+# Shapes never move, so each one is drawn once into a cached background surface when it is created.
+# Each frame only the regions that changed since the previous frame are copied to the screen and pushed
+# to the display, so frame time stays flat no matter how many shapes exist.
+class LayerRenderer:
+    def __init__(self, screen, background_color=(255, 255, 255)):
+        self.screen = screen
+        self.background_color = background_color
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(background_color)
+        self._dirty = [screen.get_rect()]  # The first frame pushes the whole screen
+
+    def add(self, shape):
+        rect = shape.draw(self.background)  # pygame.draw returns the bounding box of the changed pixels
+        if rect.width and rect.height:
+            self._dirty.append(rect)
+
+    # Repaint one region of the cached background, e.g. after a shape was removed
+    def redraw(self, rect, shapes):
+        self.background.set_clip(rect)
+        self.background.fill(self.background_color)
+        for shape in shapes:
+            shape.draw(self.background)
+        self.background.set_clip(None)
+        self._dirty.append(pygame.Rect(rect).clip(self.background.get_rect()))
+
+    # Copy the dirty regions from the background to the screen
+    def compose(self):
+        for rect in self._dirty:
+            self.screen.blit(self.background, rect, rect)
+
+    # Push the dirty regions to the display
+    def present(self):
+        if self._dirty:
+            pygame.display.update(self._dirty)
+            self._dirty = []
+
+    def render(self):
+        self.compose()
+        self.present()
+
+# Frame-time instrumentation
+# Per-frame time is split into event handling, factory creation, drawing and display flip, so the cost of
+# each part of the render path can be tracked (p50/p99 and a histogram) on machines without a display.
+class FrameTimer:
+    PHASES = ("events", "create", "draw", "flip")
+    HISTOGRAM_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66)  # Bucket upper bounds; the last bucket is open-ended
+
+    def __init__(self):
+        self.samples = {phase: [] for phase in self.PHASES + ("total",)}
+        self._current = dict.fromkeys(self.PHASES, 0.0)
+
+    def add(self, phase, seconds):
+        self._current[phase] += seconds
+
+    def end_frame(self):
+        for phase in self.PHASES:
+            self.samples[phase].append(self._current[phase])
+            self._current[phase] = 0.0
+        self.samples["total"].append(sum(self.samples[phase][-1] for phase in self.PHASES))
+
+    @staticmethod
+    def percentile(values, percent):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))]
+
+    def histogram(self, phase="total"):
+        counts = [0] * (len(self.HISTOGRAM_MS) + 1)
+        for seconds in self.samples[phase]:
+            counts[bisect.bisect_left(self.HISTOGRAM_MS, seconds * 1000)] += 1
+        return counts
+
+    def summary(self):
+        frames = len(self.samples["total"])
+        if not frames:
+            return {"frames": 0}
+        report = {"frames": frames, "histogram_ms": {"bounds": list(self.HISTOGRAM_MS), "counts": self.histogram()}}
+        for phase, values in self.samples.items():
+            report[phase] = {
+                "p50_ms": self.percentile(values, 50) * 1000,
+                "p99_ms": self.percentile(values, 99) * 1000,
+                "mean_ms": sum(values) / frames * 1000,
+                "max_ms": max(values) * 1000,
+            }
+        return report
+
+    def format_report(self):
+        summary = self.summary()
+        if not summary["frames"]:
+            return "No frames recorded"
+        lines = [f"{summary['frames']} frames"]
+        for phase in self.PHASES + ("total",):
+            stats = summary[phase]
+            lines.append(f"  {phase:<7} p50 {stats['p50_ms']:8.3f} ms   p99 {stats['p99_ms']:8.3f} ms   max {stats['max_ms']:8.3f} ms")
+        lines.append("  frame time histogram:")
+        counts = summary["histogram_ms"]["counts"]
+        labels = [f"<= {bound} ms" for bound in self.HISTOGRAM_MS] + [f" > {self.HISTOGRAM_MS[-1]} ms"]
+        for label, count in zip(labels, counts):
+            lines.append(f"  {label:>11} {count:7d} {'#' * round(50 * count / summary['frames'])}")
+        return "\n".join(lines)
+
+# Scripted input for headless runs: a list of frames, each a list of (x, y, button) clicks
+def generate_click_stream(frames, clicks_per_frame, size=(800, 600), remove_ratio=0.0, seed=0):
+    rng = random.Random(seed)
+    return [[(rng.randrange(size[0]), rng.randrange(size[1]), 3 if rng.random() < remove_ratio else 1)
+             for _ in range(clicks_per_frame)]
+            for _ in range(frames)]
+
+def load_click_stream(path):
+    with open(path) as f:
+        return [[tuple(click) for click in frame] for frame in json.load(f)]
 
 # Main function to set up and run the game loop
-def main():
+# render_mode "cached" uses LayerRenderer; "full" redraws every visible shape every frame.
+# With a click_stream the clicks are replayed one frame at a time, unthrottled, and the loop ends after the last frame.
+def main(render_mode="cached", click_stream=None, timer=None):
     pygame.init()
     screen = pygame.display.set_mode((800, 600))
     pygame.display.set_caption("Random Shapes")
     clock = pygame.time.Clock()
+    timer = timer or FrameTimer()
+    now = time.perf_counter
 
-    shape_factory = ShapeFactory()
-    shapes = []  # List to store created shapes
+    shapes = SpatialGrid()  # Spatial index of the created shapes
+    shape_factory = ShapeFactory(shapes)
+    renderer = LayerRenderer(screen) if render_mode == "cached" else None
+    frames = iter(click_stream) if click_stream is not None else None
     running = True
 
     # Main game loop
     while running:
+        frame_start = now()
+        nested = 0.0  # Creation and drawing done while handling events are counted in their own phases
+
+        if frames is not None:
+            clicks = next(frames, None)
+            if clicks is None:
+                break
+            for x, y, button in clicks:
+                pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=button))
+
         # Process events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            # Create a random shape on mouse click
+            # Right click removes the top-most shape under the cursor
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                hits = shapes.query_point(*event.pos)
+                if hits:
+                    removed = hits[-1]
+                    shapes.remove(removed)
+                    if renderer is not None:
+                        start = now()
+                        rect = removed.bounds()
+                        renderer.redraw(rect, shapes.query_rect(rect))
+                        timer.add("draw", now() - start)
+                        nested += now() - start
+            # Create a random shape on any other mouse click
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = pygame.mouse.get_pos()
+                start = now()
+                x, y = event.pos
                 shape_type = random.choice(list(ShapeType))
                 context = ShapeContext(shape_type, x, y)
                 shape = shape_factory.create_shape(context)
-                shapes.append(shape)
+                created = now()
+                timer.add("create", created - start)
+                if renderer is not None:
+                    renderer.add(shape)
+                    timer.add("draw", now() - created)
+                nested += now() - start
+        draw_start = now()
+        timer.add("events", draw_start - frame_start - nested)
 
-        # Clear the screen
-        screen.fill((255, 255, 255))
+        if renderer is not None:
+            # Push only the regions covered by new shapes
+            renderer.compose()
+            flip_start = now()
+            renderer.present()
+        else:
+            # Clear the screen
+            screen.fill((255, 255, 255))
 
-        # Draw all the shapes
-        for shape in shapes:
-            shape.draw(screen)
+            # Draw only the shapes inside the viewport
+            for shape in shapes.query_viewport(screen.get_rect()):
+                shape.draw(screen)
 
-        # Update the display
-        pygame.display.flip()
-        clock.tick(60)
+            # Update the display
+            flip_start = now()
+            pygame.display.flip()
+        timer.add("draw", flip_start - draw_start)
+        timer.add("flip", now() - flip_start)
+        timer.end_frame()
+
+        if frames is None:
+            clock.tick(60)
 
     pygame.quit()
+    return timer
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Random shapes demo for the Factory pattern.")
+    parser.add_argument("--render-mode", choices=("cached", "full"), default="cached")
+    parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver and replay clicks")
+    parser.add_argument("--frames", type=int, default=600, help="frames to replay in headless mode")
+    parser.add_argument("--clicks-per-frame", type=int, default=10, help="generated clicks per frame in headless mode")
+    parser.add_argument("--remove-ratio", type=float, default=0.0, help="share of generated clicks that remove a shape")
+    parser.add_argument("--script", help="JSON click stream to replay: a list of frames of [x, y, button] clicks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="write the frame-time summary as JSON to this file")
+    args = parser.parse_args()
+
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    random.seed(args.seed)
+    if args.script:
+        click_stream = load_click_stream(args.script)
+    elif args.headless:
+        click_stream = generate_click_stream(args.frames, args.clicks_per_frame, remove_ratio=args.remove_ratio, seed=args.seed)
+    else:
+        click_stream = None
+
+    timer = main(args.render_mode, click_stream)
+    print(timer.format_report())
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(timer.summary(), f, indent=2)
\ No newline at end of file
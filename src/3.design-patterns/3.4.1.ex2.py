@@ -1,11 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
+from array import array
 import xml.etree.ElementTree as ET
 import json
+import codecs
+import io
+import mmap
+import os
+import re
+import struct
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 # Contact data container class
 class Contact:
+    __slots__ = ('full_name', 'email', 'phone_number', 'is_friend')
+
     def __init__(self, full_name, email, phone_number, is_friend):
         self.full_name = full_name
         self.email = email
@@ -16,6 +28,184 @@ class Contact:
         return f"{self.full_name} ({self.email}) - {self.phone_number} {'(Friend)' if self.is_friend else ''}"
 
 
+# Column of strings packed into a single UTF-8 buffer with an offsets array, instead of one str object per row.
+# None values are tracked separately so they round-trip unchanged.
+class StringColumn:
+    __slots__ = ('_data', '_offsets', '_nulls')
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._nulls = set()
+
+    def append(self, value):
+        if value is None:
+            self._nulls.add(len(self))
+        else:
+            self._data += str(value).encode('utf-8')
+        self._offsets.append(len(self._data))
+
+    # Append every value of another column by concatenating its buffers; nothing is decoded or re-encoded
+    def extend_column(self, other):
+        base_rows, base_bytes = len(self), len(self._data)
+        self._data += other._data
+        self._offsets.extend(array('Q', map(base_bytes.__add__, other._offsets[1:])))
+        self._nulls.update(base_rows + index for index in other._nulls)
+
+    def __getitem__(self, index):
+        if index in self._nulls:
+            return None
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+    # Binary layout: header (data length, offsets count, nulls count), then the raw buffers
+    def dump(self, f):
+        nulls = array('Q', sorted(self._nulls))
+        f.write(struct.pack('<QQQ', len(self._data), len(self._offsets), len(nulls)))
+        f.write(self._data)
+        f.write(self._offsets.tobytes())
+        f.write(nulls.tobytes())
+
+    @classmethod
+    def load(cls, f):
+        data_size, offsets_count, nulls_count = struct.unpack('<QQQ', _read_exact(f, 24))
+        column = cls()
+        column._data = bytearray(_read_exact(f, data_size))
+        column._offsets = array('Q')
+        column._offsets.frombytes(_read_exact(f, offsets_count * 8))
+        nulls = array('Q')
+        nulls.frombytes(_read_exact(f, nulls_count * 8))
+        column._nulls = set(nulls)
+        return column
+
+
+# Lightweight view of one row of a ContactTable that behaves like a Contact
+class ContactRow:
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def full_name(self):
+        return self._table.full_names[self._index]
+
+    @property
+    def email(self):
+        return self._table.emails[self._index]
+
+    @property
+    def phone_number(self):
+        return self._table.phone_numbers[self._index]
+
+    @property
+    def is_friend(self):
+        return self._table.is_friend(self._index)
+
+    __str__ = Contact.__str__
+
+
+# Columnar contact storage: one packed column per field and a bit-packed is_friend column.
+# Adapters fill it directly from parsed records, so no Contact object is created per row.
+class ContactTable:
+    def __init__(self):
+        self.full_names = StringColumn()
+        self.emails = StringColumn()
+        self.phone_numbers = StringColumn()
+        self._friend_bits = bytearray()
+        self._size = 0
+
+    def append(self, full_name, email, phone_number, is_friend):
+        index = self._size
+        self.full_names.append(full_name)
+        self.emails.append(email)
+        self.phone_numbers.append(phone_number)
+        if index % 8 == 0:
+            self._friend_bits.append(0)
+        if is_friend:
+            self._friend_bits[index >> 3] |= 1 << (index & 7)
+        self._size += 1
+
+    # Accepts an iterable of records or another ContactTable, whose column buffers are concatenated directly
+    def extend(self, records):
+        if isinstance(records, ContactTable):
+            self._extend_table(records)
+            return
+        for record in records:
+            self.append(*record)
+
+    def _extend_table(self, other):
+        self.full_names.extend_column(other.full_names)
+        self.emails.extend_column(other.emails)
+        self.phone_numbers.extend_column(other.phone_numbers)
+        # Shift the other table's friend bits past this table's last row, using int arithmetic on the bytes
+        size = self._size + other._size
+        bits = int.from_bytes(self._friend_bits, 'little') | (int.from_bytes(other._friend_bits, 'little') << self._size)
+        self._friend_bits = bytearray(bits.to_bytes((size + 7) // 8, 'little'))
+        self._size = size
+
+    def is_friend(self, index):
+        return bool(self._friend_bits[index >> 3] >> (index & 7) & 1)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ContactTable index out of range")
+        return ContactRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield ContactRow(self, index)
+
+    def records(self) -> Iterator[tuple]:
+        for index in range(self._size):
+            yield (self.full_names[index], self.emails[index], self.phone_numbers[index], self.is_friend(index))
+
+    @property
+    def nbytes(self):
+        return self.full_names.nbytes + self.emails.nbytes + self.phone_numbers.nbytes + len(self._friend_bits)
+
+    # Compact binary format used by the on-disk cache
+    MAGIC = b'CTB1'
+
+    def dump(self, f):
+        f.write(self.MAGIC + struct.pack('<Q', self._size))
+        for column in (self.full_names, self.emails, self.phone_numbers):
+            column.dump(f)
+        f.write(self._friend_bits)
+
+    @classmethod
+    def load(cls, f):
+        magic, size = struct.unpack('<4sQ', _read_exact(f, 12))
+        if magic != cls.MAGIC:
+            raise ValueError("Not a ContactTable file")
+        table = cls()
+        table.full_names = StringColumn.load(f)
+        table.emails = StringColumn.load(f)
+        table.phone_numbers = StringColumn.load(f)
+        table._friend_bits = bytearray(_read_exact(f, (size + 7) // 8))
+        table._size = size
+        return table
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated ContactTable data")
+    return data
+
+
 # Our base class for reading file data
 class FileReader(ABC) :
     def __init__(self, file_name):
@@ -25,6 +215,11 @@ class FileReader(ABC) :
     def read(self) -> str:
         pass
 
+    # Binary stream the adapters parse incrementally. By default it wraps read(), so a reader that only
+    # implements read() still works; readers backed by a file on disk override this to stream it instead.
+    def open(self):
+        return io.BytesIO(self.read().encode('utf-8'))
+
 # Abstract base class for all Contact Data Adapters
 class ContactsAdapter(ABC):
     def __init__(self, data_source: FileReader):
@@ -34,39 +229,207 @@ class ContactsAdapter(ABC):
     def get_contacts(self) -> List[Contact]:
         pass
 
+    # Yield contacts one by one; adapters that can stream their source override this
+    def iter_contacts(self) -> Iterator[Contact]:
+        yield from self.get_contacts()
+
+    # Yield (full_name, email, phone_number, is_friend) tuples without building Contact objects
+    def iter_records(self) -> Iterator[tuple]:
+        for contact in self.iter_contacts():
+            yield (contact.full_name, contact.email, contact.phone_number, contact.is_friend)
+
+    # Fill a compact columnar table directly from the parsed records
+    def get_contact_table(self) -> ContactTable:
+        table = ContactTable()
+        table.extend(self.iter_records())
+        return table
+
 
 # Specific implementation of the adapter to read XML Source data
 class XMLContactsAdapter(ContactsAdapter):
     def get_contacts(self):
-        # Parse XML data into an ElementTree object
-        root = ET.fromstring(self.data_source.read()) # Read XML data from a file
-        # Extract contact information from the XML and create Contact objects
-        contacts = []
-        for elem in root.iter():
-            if elem.tag == 'contact':
-                full_name = elem.find('full_name').text
-                email = elem.find('email').text
-                phone_number = elem.find('phone_number').text
-                is_friend = elem.find('is_friend').text.lower() == 'true'
-                contact = Contact(full_name, email, phone_number, is_friend)
-                contacts.append(contact)
-        return contacts
+        return list(self.iter_contacts())
+
+    def iter_contacts(self):
+        for record in self.iter_records():
+            yield Contact(*record)
+
+    def iter_records(self):
+        with self.data_source.open() as f:
+            yield from self._parse_records(f)
+
+    def _parse_records(self, f):
+        # Stream the XML with iterparse so each contact is yielded as soon as its closing tag is read,
+        # instead of building the whole tree in memory first
+        parents = []
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag != 'contact':
+                continue
+            full_name = elem.find('full_name').text
+            email = elem.find('email').text
+            phone_number = elem.find('phone_number').text
+            is_friend = elem.find('is_friend').text.lower() == 'true'
+            yield (full_name, email, phone_number, is_friend)
+            # Free the parsed element so memory stays flat as the file grows
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+    # Split the file into byte spans of roughly target_size that start and end on <contact> boundaries,
+    # so each span can be parsed on its own by a different process.
+    # Splitting is only safe for a flat layout: an optional XML declaration, the root element, then <contact>
+    # records directly under it with no other markup (wrapper elements, comments, CDATA) in between.
+    # Any other file, or a reader not backed by a file on disk, returns [] and has to be parsed whole.
+    def record_spans(self, target_size):
+        if not self._file_backed():
+            return []
+        with open(self.data_source.file_name, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                first = CONTACT_START_TAG.search(data)
+                last = data.rfind(b'</contact>')
+                if first is None or last < 0:
+                    return []
+                prolog = XML_PROLOG.match(data[:first.start()])
+                end = last + len(b'</contact>')
+                if prolog is None or FOREIGN_MARKUP.search(data, first.start(), end):
+                    return []
+                # Every span is parsed with the file's own declaration (and so its encoding) and root element
+                head = (prolog.group('declaration') or b'') + prolog.group('root')
+                tail = b'</' + prolog.group('name') + b'>'
+                spans = []
+                start = first.start()
+                while start < end:
+                    match = CONTACT_START_TAG.search(data, min(start + target_size, end), end)
+                    stop = match.start() if match else end
+                    spans.append((start, stop, head, tail))
+                    start = stop
+                return spans
+
+    def _file_backed(self):
+        return isinstance(self.data_source, (XMLReader, MMapReader))
+
+    # Parse only the contacts inside one span returned by record_spans
+    def iter_span_records(self, span):
+        start, stop, head, tail = span
+        with open(self.data_source.file_name, 'rb') as f:
+            f.seek(start)
+            data = f.read(stop - start)
+        yield from self._parse_records(io.BytesIO(head + data + tail))
+
+# Incremental JSON tokenizer that keeps only a bounded window of the file in memory.
+# Values are decoded with raw_decode as soon as they are complete; more text is read only when needed.
+class JSONStream:
+    def __init__(self, f, chunk_size=64 * 1024):
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        # Drop the consumed prefix before reading ahead so the buffer only holds the current record
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = self._file.read(self._chunk_size)
+        self._eof = not chunk
+        self._buffer += self._text_decoder.decode(chunk, final=self._eof)
+        return not self._eof
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\n\r':
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def peek(self):
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise ValueError("Unexpected end of JSON data")
+        return self._buffer[self._pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON data")
+        self._pos += 1
+
+    def value(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off at the end of the buffer may continue in the next chunk
+            if self._eof or (end < len(self._buffer) and self._buffer[end] not in '0123456789.eE+-'):
+                self._pos = end
+                return value
+            self._fill()
+
+    def iter_array(self, key):
+        # Walk the top-level object and yield the items of its `key` array one at a time.
+        # Like indexing the parsed object, a missing key raises KeyError instead of looking like an empty array.
+        self.expect('{')
+        found = False
+        if self.peek() == '}':
+            raise KeyError(key)
+        while True:
+            name = self.value()
+            self.expect(':')
+            if name == key:
+                found = True
+                self.expect('[')
+                if self.peek() != ']':
+                    while True:
+                        yield self.value()
+                        if self.peek() != ',':
+                            break
+                        self._pos += 1
+                self.expect(']')
+            else:
+                self.value()
+            if self.peek() != ',':
+                break
+            self._pos += 1
+        self.expect('}')
+        if not found:
+            raise KeyError(key)
+
 
 # Specific implementation of the adapter to read JSON Source data
 class JSONContactsAdapter(ContactsAdapter):
+    def __init__(self, data_source: FileReader, chunk_size=64 * 1024):
+        super().__init__(data_source)
+        self.chunk_size = chunk_size
+
     def get_contacts(self):
-        # Parse JSON data into a dictionary
-        data_dict = json.loads(self.data_source.read()) # Read JSON data from a file
-        # Extract contact information from the dictionary and create Contact objects
-        contacts = []
-        for contact_data in data_dict['contacts']:
-            full_name = contact_data['full_name']
-            email = contact_data['email']
-            phone_number = contact_data['phone_number']
-            is_friend = contact_data['is_friend']
-            contact = Contact(full_name, email, phone_number, is_friend)
-            contacts.append(contact)
-        return contacts
+        return list(self.iter_contacts())
+
+    def iter_contacts(self):
+        for record in self.iter_records():
+            yield Contact(*record)
+
+    def iter_records(self):
+        # Tokenize the file incrementally so each contact is yielded as soon as its object is complete.
+        # Peak memory depends on chunk_size and the largest record, not on the file size.
+        with self.data_source.open() as f:
+            for contact_data in JSONStream(f, self.chunk_size).iter_array('contacts'):
+                full_name = contact_data['full_name']
+                email = contact_data['email']
+                phone_number = contact_data['phone_number']
+                is_friend = contact_data['is_friend']
+                yield (full_name, email, phone_number, is_friend)
 
 
 # Specific implementation of the file reader to be used with XML Files
@@ -76,6 +439,9 @@ class XMLReader(FileReader):
         with open(self.file_name, 'r') as f:
             return f.read()
 
+    def open(self):
+        return open(self.file_name, 'rb')
+
 # Specific implementation of the file reader to be used with JSON files
 class JSONReader(FileReader):
     def read(self):
@@ -83,21 +449,325 @@ class JSONReader(FileReader):
         with open(self.file_name, 'r') as f:
             return f.read()
 
+    def open(self):
+        return open(self.file_name, 'rb')
+
+# Read-only stream over a memoryview, handing out zero-copy slices to the incremental parsers
+class MemoryViewStream:
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def read(self, size=-1):
+        start = self._pos
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._pos = end
+        return self._view[start:end]
+
+    def close(self):
+        self._view = memoryview(b'')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Specific implementation of the file reader backed by mmap.
+# The mapping is created once and reused, so the same file can be parsed many times straight from
+# the page cache without ever copying it into Python heap memory.
+class MMapReader(FileReader):
+    def __init__(self, file_name):
+        super().__init__(file_name)
+        self._file = None
+        self._map = None
+
+    def _mapping(self):
+        if self._map is None:
+            self._file = open(self.file_name, 'rb')
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b''  # Empty files cannot be mapped
+        return self._map
+
+    def read(self):
+        # Kept for compatibility with the other readers; this decodes the whole file into a string
+        return str(self.view(), 'utf-8')
+
+    def view(self) -> memoryview:
+        return memoryview(self._mapping())
+
+    def chunks(self, chunk_size=1024 * 1024) -> Iterator[memoryview]:
+        view = self.view()
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+    def open(self):
+        return MemoryViewStream(self.view())
+
+    # Only the file name is sent to worker processes; each process maps the file itself
+    def __getstate__(self):
+        return {'file_name': self.file_name, '_file': None, '_map': None}
+
+    # Views handed out by view(), chunks() or open() must be released before closing the mapping
+    def close(self):
+        if self._map is not None:
+            if isinstance(self._map, mmap.mmap):
+                self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Two-level cache of parsed contacts: an in-process LRU bounded by max_memory on top of an on-disk store.
+# Entries are keyed by adapter type, path, size and mtime (plus a content hash when use_hash is set),
+# so a changed file is parsed again while an unchanged one is loaded without parsing.
+class ContactCache:
+    def __init__(self, directory, max_memory=256 * 1024 * 1024, use_hash=False):
+        self.directory = directory
+        self.max_memory = max_memory
+        self.use_hash = use_hash
+        self._tables = OrderedDict()  # (adapter type, path, size, mtime) -> table, least recently used first
+        self._memory = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # Cheap in-memory key: checked before the file is hashed or read at all
+    def _key(self, adapter):
+        path = os.path.abspath(adapter.data_source.file_name)
+        stat = os.stat(path)
+        return type(adapter).__name__, path, stat.st_size, stat.st_mtime_ns
+
+    # On-disk entries are named <source prefix>-<digest>.contacts, so entries for the same source can be found.
+    # With use_hash the digest covers the file content instead of its size and mtime.
+    def _entry_path(self, key):
+        kind, path, size, mtime = key
+        prefix = hashlib.sha256(f"{kind}\0{path}".encode()).hexdigest()[:16]
+        digest = hashlib.sha256(f"{kind}\0{path}".encode())
+        if self.use_hash:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        else:
+            digest.update(f"\0{size}\0{mtime}".encode())
+        return prefix, os.path.join(self.directory, f"{prefix}-{digest.hexdigest()}.contacts")
+
+    def get_table(self, adapter) -> ContactTable:
+        key = self._key(adapter)
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            return table
+
+        prefix, path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                table = ContactTable.load(f)
+        except (FileNotFoundError, ValueError):
+            table = adapter.get_contact_table()
+            # Write to a temporary file first so readers never see a partial cache entry
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                table.dump(f)
+            os.replace(tmp_path, path)
+            self._remove_stale(prefix, path)
+        self._remember(key, table)
+        return table
+
+    # Delete on-disk entries left behind by earlier versions of the same source file
+    def _remove_stale(self, prefix, current):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(prefix + '-') and name.endswith('.contacts') and path != current:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Already removed by another process
+
+    def _remember(self, key, table):
+        # Drop the table of an earlier version of the same source
+        for old_key in [old_key for old_key in self._tables if old_key[:2] == key[:2]]:
+            self._memory -= self._tables.pop(old_key).nbytes
+        size = table.nbytes
+        if size > self.max_memory:
+            return
+        while self._tables and self._memory + size > self.max_memory:
+            _, evicted = self._tables.popitem(last=False)
+            self._memory -= evicted.nbytes
+        self._tables[key] = table
+        self._memory += size
+
+    def clear(self):
+        self._tables.clear()
+        self._memory = 0
+
+
+# Adapter decorator that serves contacts from a ContactCache instead of parsing the source every time.
+# The returned table is shared with the cache and should be treated as read-only.
+class CachedContactsAdapter(ContactsAdapter):
+    def __init__(self, adapter: ContactsAdapter, cache: ContactCache):
+        super().__init__(adapter.data_source)
+        self.adapter = adapter
+        self.cache = cache
+
+    def get_contacts(self):
+        return [Contact(*record) for record in self.iter_records()]
+
+    def iter_contacts(self):
+        for record in self.iter_records():
+            yield Contact(*record)
+
+    def iter_records(self):
+        return self.get_contact_table().records()
+
+    def get_contact_table(self):
+        return self.cache.get_table(self.adapter)
+
+
+# Contact store with hash indexes on normalized email and phone number and a friend/non-friend partition.
+# Inserting a record that matches an existing contact by email (or else by phone) merges into it,
+# so merging several sources deduplicates in constant time per record.
+class ContactIndex:
+    def __init__(self):
+        self._contacts = []
+        self._by_email = {}
+        self._by_phone = {}
+        # dicts used as insertion-ordered sets of contact positions
+        self._friends = {}
+        self._non_friends = {}
+
+    @staticmethod
+    def normalize_email(email):
+        return (email.strip().lower() or None) if email else None
+
+    @staticmethod
+    def normalize_phone(phone_number):
+        if phone_number is None:
+            return None
+        return ''.join(ch for ch in str(phone_number) if ch.isdigit()) or None
+
+    def upsert(self, full_name, email, phone_number, is_friend) -> Contact:
+        email_key = self.normalize_email(email)
+        phone_key = self.normalize_phone(phone_number)
+        index = self._by_email.get(email_key) if email_key else None
+        if index is None and phone_key:
+            index = self._by_phone.get(phone_key)
+
+        if index is None:
+            index = len(self._contacts)
+            contact = Contact(full_name, email, phone_number, is_friend)
+            self._contacts.append(contact)
+        else:
+            # Keep existing values and fill in whatever the earlier sources were missing
+            contact = self._contacts[index]
+            contact.full_name = contact.full_name or full_name
+            contact.email = contact.email or email
+            contact.phone_number = contact.phone_number or phone_number
+            contact.is_friend = contact.is_friend or is_friend
+
+        if email_key:
+            self._by_email.setdefault(email_key, index)
+        if phone_key:
+            self._by_phone.setdefault(phone_key, index)
+        if contact.is_friend:
+            self._non_friends.pop(index, None)
+            self._friends[index] = None
+        else:
+            self._non_friends[index] = None
+        return contact
+
+    def add(self, contact):
+        return self.upsert(contact.full_name, contact.email, contact.phone_number, contact.is_friend)
+
+    # Bulk insert from any ContactsAdapter, deduplicating against what is already indexed
+    def add_from(self, adapter: ContactsAdapter):
+        for record in adapter.iter_records():
+            self.upsert(*record)
+        return self
+
+    def find_by_email(self, email):
+        index = self._by_email.get(self.normalize_email(email))
+        return None if index is None else self._contacts[index]
+
+    def find_by_phone(self, phone_number):
+        index = self._by_phone.get(self.normalize_phone(phone_number))
+        return None if index is None else self._contacts[index]
+
+    def friends(self) -> Iterator[Contact]:
+        return (self._contacts[index] for index in self._friends)
+
+    def non_friends(self) -> Iterator[Contact]:
+        return (self._contacts[index] for index in self._non_friends)
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def __iter__(self):
+        return iter(self._contacts)
+
+
+# Parallel ingestion: spread many sources (and spans of very large XML files) across a process pool
+# and merge the results into one ContactTable
+CONTACT_START_TAG = re.compile(rb'<contact[\s/>]')
+# What may precede the first contact for a file to be split: a declaration and the root start tag
+XML_PROLOG = re.compile(rb'\A(?:\xef\xbb\xbf)?(?P<declaration><\?xml[^?]*\?>)?\s*'
+                        rb'(?P<root><(?P<name>[A-Za-z_][\w.-]*)(?:\s[^>]*)?>)\s*\Z')
+# Any markup between records other than a contact and its fields
+FOREIGN_MARKUP = re.compile(rb'<(?!/?(?:contact|full_name|email|phone_number|is_friend)[\s/>])')
+
+# Workers return compact ContactTables, so the parent merges column buffers instead of re-encoding every record
+def _ingest_task(adapter, span):
+    if span is None:
+        return adapter.get_contact_table()
+    table = ContactTable()
+    table.extend(adapter.iter_span_records(span))
+    return table
+
+def ingest_contacts(adapters, max_workers=None, split_size=64 * 1024 * 1024, ordered=True) -> ContactTable:
+    # XML files larger than split_size are parsed in record-aligned spans; JSON files are parsed whole,
+    # since finding record boundaries in JSON requires tokenizing the file anyway
+    tasks = []
+    for adapter in adapters:
+        spans = None
+        if (isinstance(adapter, XMLContactsAdapter) and adapter._file_backed()
+                and os.path.getsize(adapter.data_source.file_name) > split_size):
+            spans = adapter.record_spans(split_size)
+        if spans:
+            tasks.extend((adapter, span) for span in spans)
+        else:
+            tasks.append((adapter, None))
+
+    # With ordered=True contacts keep the order of the sources; otherwise they are merged as soon as each task finishes
+    table = ContactTable()
+    with ProcessPoolExecutor(max_workers) as pool:
+        futures = [pool.submit(_ingest_task, adapter, span) for adapter, span in tasks]
+        for future in futures if ordered else as_completed(futures):
+            table.extend(future.result())
+    return table
+
 # Simple display routine to display Contact data to the console      
 def print_contact_data(contacts_source : ContactsAdapter):
-    # Print the Contact objects
-    for contact in contacts_source.get_contacts():
+    # Print the Contact objects as they are produced
+    for contact in contacts_source.iter_contacts():
         print(contact)
 
 # Example usage
-xml_reader = XMLReader('contacts.xml')
-# Create an XML adapter and convert the data to a list of Contact objects
-xml_adapter = XMLContactsAdapter(xml_reader)
-# Print the Contact objects
-print_contact_data(xml_adapter)
-
-json_reader = JSONReader('contacts.json')
-# Create a JSON adapter and convert the data to a list of Contact objects
-json_adapter = JSONContactsAdapter(json_reader)
-# Print the Contact objects
-print_contact_data(json_adapter)
+def main():
+    xml_reader = XMLReader('contacts.xml')
+    # Create an XML adapter and stream the data as Contact objects
+    xml_adapter = XMLContactsAdapter(xml_reader)
+    # Print the Contact objects
+    print_contact_data(xml_adapter)
+
+    json_reader = JSONReader('contacts.json')
+    # Create a JSON adapter and stream the data as Contact objects
+    json_adapter = JSONContactsAdapter(json_reader)
+    # Print the Contact objects
+    print_contact_data(json_adapter)
+
+if __name__ == "__main__":
+    main()
@@ -8,29 +8,72 @@
 
 # Step 1: Define the Strategy Interface
 from abc import ABC, abstractmethod
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; array('d') buffers are priced without it
+    np = None
 
 class DiscountStrategy(ABC):
     @abstractmethod
     def calculate_price(self, price: float) -> float:
         pass
 
+    # Price a whole buffer at once. Strategies without a vectorized version fall back to the scalar path.
+    def calculate_price_batch(self, prices):
+        if np is not None and isinstance(prices, np.ndarray):
+            return np.fromiter(map(self.calculate_price, prices), dtype=np.float64, count=len(prices))
+        return array('d', map(self.calculate_price, prices))
+
+    # Strategies that price as `price * factor` return that factor; anything else returns None
+    def linear_factor(self):
+        return None
+
+
+# Multiply every price by the same factor and return a new buffer of the same kind as the input
+def scale_prices(prices, factor: float):
+    if np is not None:
+        if isinstance(prices, np.ndarray):
+            return np.asarray(prices, dtype=np.float64) * factor
+        result = array('d', prices)
+        np.frombuffer(result, dtype=np.float64)[:] *= factor  # In-place on the array's buffer
+        return result
+    return array('d', [price * factor for price in prices])
+
 
 # step 2: Implement Concrete Strategies
 
-# Strategy 1: No Discount
-class RegularPriceStrategy(DiscountStrategy):
+# Discounts that multiply the price by a fixed factor. A subclass that overrides calculate_price
+# (e.g. to cap the discount) is no longer linear and is batch-priced through its own scalar method.
+class LinearDiscountStrategy(DiscountStrategy):
+    factor = 1.0
+
     def calculate_price(self, price: float) -> float:
-        return price
+        return price * self.factor
+
+    def linear_factor(self):
+        if type(self).calculate_price is LinearDiscountStrategy.calculate_price:
+            return self.factor
+        return None
+
+    def calculate_price_batch(self, prices):
+        factor = self.linear_factor()
+        if factor is None:
+            return super().calculate_price_batch(prices)
+        return scale_prices(prices, factor)
+
+# Strategy 1: No Discount
+class RegularPriceStrategy(LinearDiscountStrategy):
+    factor = 1.0
 
 # Strategy 2: 20% Seasonal Discount
-class SeasonalDiscountStrategy(DiscountStrategy):
-    def calculate_price(self, price: float) -> float:
-        return price * 0.80
+class SeasonalDiscountStrategy(LinearDiscountStrategy):
+    factor = 0.80
 
 # Strategy 3: VIP Discount (50% off!)
-class VIPDiscountStrategy(DiscountStrategy):
-    def calculate_price(self, price: float) -> float:
-        return price * 0.50
+class VIPDiscountStrategy(LinearDiscountStrategy):
+    factor = 0.50
 
 
 # step 3. The Context
@@ -48,8 +91,107 @@ class PriceCalculator:
         result = self._strategy.calculate_price(price)
         print(f"Original: ${price} -> Final: ${result:.2f}")
 
+    # Reprice a whole catalog (NumPy array or array('d') buffer) without printing every result
+    def calculate_many(self, prices):
+        return self._strategy.calculate_price_batch(prices)
+
+
+# step 4. Composing Strategies
+# Several strategies (e.g. seasonal then VIP) are fused ahead of time into one pricing function.
+# Strategies whose linear_factor() is not None are linear, so consecutive linear steps collapse into a single multiplier.
+def _multiplier(factor: float):
+    return lambda price: price * factor
+
+def compile_pricing(*strategies):
+    steps = []
+    factor = None
+    for strategy in strategies:
+        step_factor = strategy.linear_factor()
+        if step_factor is None:
+            if factor is not None:
+                steps.append(_multiplier(factor))
+                factor = None
+            steps.append(strategy.calculate_price)  # Bound once here, not on every call
+        else:
+            factor = step_factor if factor is None else factor * step_factor
+    if factor is not None:
+        steps.append(_multiplier(factor))
+
+    if not steps:
+        return lambda price: price
+    if len(steps) == 1:
+        return steps[0]
+
+    steps = tuple(steps)
+    def pricing(price):
+        for step in steps:
+            price = step(price)
+        return price
+    return pricing
+
+
+class PipelineStrategy(DiscountStrategy):
+    def __init__(self, *strategies: DiscountStrategy):
+        self.strategies = strategies
+        self._pricing = compile_pricing(*strategies)
+        self._factor = None
+        factors = [strategy.linear_factor() for strategy in strategies]
+        if None not in factors:
+            # Fully linear pipeline: expose the fused factor so it can be nested and batch-priced directly
+            self._factor = 1.0
+            for factor in factors:
+                self._factor *= factor
 
-# 4. Client Code
+    def calculate_price(self, price: float) -> float:
+        return self._pricing(price)
+
+    def linear_factor(self):
+        if type(self).calculate_price is PipelineStrategy.calculate_price:
+            return self._factor
+        return None
+
+    def calculate_price_batch(self, prices):
+        factor = self.linear_factor()
+        if factor is not None:
+            return scale_prices(prices, factor)
+        for strategy in self.strategies:
+            prices = strategy.calculate_price_batch(prices)
+        return prices
+
+
+# Maps each customer segment to a precompiled pricing function, so pricing a mixed stream of customers
+# costs one dict lookup and one call per item instead of swapping strategies on a PriceCalculator.
+class SegmentPricingTable:
+    def __init__(self, segments: dict):
+        self._pricing = {}
+        for segment, strategies in segments.items():
+            if isinstance(strategies, DiscountStrategy):
+                strategies = (strategies,)
+            self._pricing[segment] = compile_pricing(*strategies)
+
+    # Only a failed segment lookup becomes ValueError; errors raised by a strategy propagate unchanged
+    def _pricing_for(self, segment):
+        pricing = self._pricing.get(segment)
+        if pricing is None:
+            raise ValueError(f"Unknown customer segment: {segment}")
+        return pricing
+
+    def price(self, segment, price: float) -> float:
+        return self._pricing_for(segment)(price)
+
+    # Price an iterable of (segment, price) pairs
+    def price_stream(self, orders):
+        get = self._pricing.get
+        prices = []
+        for segment, price in orders:
+            pricing = get(segment)
+            if pricing is None:
+                pricing = self._pricing_for(segment)
+            prices.append(pricing(price))
+        return prices
+
+
+# 5. Client Code
 # The client picks the strategy and passes it to the context.
 def main():
     # Start with a regular price strategy
@@ -68,5 +210,23 @@ def main():
     calculator.set_strategy(VIPDiscountStrategy())
     calculator.calculate(100.0)  # Output: 50.00
 
+    print("--- Repricing the whole catalog at once ---")
+
+    catalog = array('d', [100.0, 250.0, 19.99])
+    print(list(calculator.calculate_many(catalog)))  # Output: [50.0, 125.0, 9.995]
+
+    print("--- Seasonal sale for VIP customers ---")
+
+    # Both discounts are linear, so the pipeline collapses into a single 0.40 multiplier
+    calculator.set_strategy(PipelineStrategy(SeasonalDiscountStrategy(), VIPDiscountStrategy()))
+    calculator.calculate(100.0)  # Output: 40.00
+
+    segments = SegmentPricingTable({
+        "regular": RegularPriceStrategy(),
+        "vip": VIPDiscountStrategy(),
+        "vip_sale": (SeasonalDiscountStrategy(), VIPDiscountStrategy()),
+    })
+    print(segments.price_stream([("regular", 100.0), ("vip", 100.0), ("vip_sale", 100.0)]))  # Output: [100.0, 50.0, 40.0]
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
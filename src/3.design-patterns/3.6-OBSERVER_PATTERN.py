@@ -7,6 +7,16 @@
 
 # Step 1: Define the Subject Interface
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum, auto
+import asyncio
+import inspect
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
 
 class Subject(ABC):
     @abstractmethod
@@ -22,21 +32,67 @@ class Subject(ABC):
         pass
 
 
+# Insertion-ordered observer registry with O(1) attach and detach.
+# Observers are keyed by id() so unhashable observers work too. With weak=True they are held through
+# weak references and removed automatically once garbage collected, so users who never detach don't leak;
+# on_dead(key) is then called with the id() the collected observer was registered under.
+class ObserverRegistry:
+    def __init__(self, weak=False, on_dead=None):
+        self._weak = weak
+        self._on_dead = on_dead
+        self._entries = {}
+
+    def add(self, observer):
+        key = id(observer)
+        if key in self._entries:
+            return False
+        if self._weak:
+            entries = self._entries
+            on_dead = self._on_dead
+            def remove_dead(ref, key=key):
+                if entries.get(key) is ref:
+                    del entries[key]
+                    if on_dead is not None:
+                        on_dead(key)
+            self._entries[key] = weakref.ref(observer, remove_dead)
+        else:
+            self._entries[key] = observer
+        return True
+
+    def discard(self, observer):
+        return self._entries.pop(id(observer), None) is not None
+
+    # Iterate over a snapshot so observers can attach or detach while a broadcast is running.
+    # Observers detached mid-broadcast are skipped; observers attached mid-broadcast wait for the next one.
+    def __iter__(self):
+        entries = self._entries
+        for key, entry in tuple(entries.items()):
+            if entries.get(key) is not entry:
+                continue
+            if self._weak:
+                entry = entry()
+                if entry is None:
+                    continue
+            yield entry
+
+    def __contains__(self, observer):
+        return id(observer) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
 # Step 2: Implement Concrete Subject
 class NewsFeed(Subject):
-    def __init__(self):
-        self._observers = []
+    def __init__(self, weak=False):
+        self._observers = ObserverRegistry(weak)
         self._latest_news = None
 
     def attach(self, observer):
-        if observer not in self._observers:
-            self._observers.append(observer)
+        self._observers.add(observer)
 
     def detach(self, observer):
-        try:
-            self._observers.remove(observer)
-        except ValueError:
-            pass
+        self._observers.discard(observer)
 
     def notify(self):
         for observer in self._observers:
@@ -53,6 +109,11 @@ class Observer(ABC):
     def update(self, news):
         pass
 
+    # Receive several news items in one call; override to handle a batch at once
+    def update_many(self, items):
+        for news in items:
+            self.update(news)
+
 
 # Step 4: Implement Concrete Observers
 class User(Observer):
@@ -63,6 +124,457 @@ class User(Observer):
         print(f"{self._name} received news: {news}")
 
 
+# Asynchronous delivery: every observer gets its own bounded queue and delivery task, so publishing only
+# enqueues and a slow subscriber never blocks add_news for everyone else.
+# update may be a coroutine function or a plain function; plain functions run in a worker thread.
+# With weak=True the queue and task of a collected observer are removed on the feed's next call.
+class OverflowPolicy(Enum):
+    DROP_OLDEST = auto()  # Discard the oldest queued item to make room
+    BLOCK = auto()        # Wait for room; only possible through `await publish()`
+    DISCONNECT = auto()   # Detach the observer that cannot keep up
+
+
+class AsyncNewsFeed(NewsFeed):
+    def __init__(self, queue_size=100, max_concurrency=None, overflow=OverflowPolicy.DROP_OLDEST, weak=False):
+        super().__init__(weak)
+        self._weak = weak
+        self._dead = deque()  # Ids of collected observers; cleaned up lazily, not from the GC callback
+        self._observers = ObserverRegistry(weak, self._dead.append)
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._queues = {}
+        self._tasks = {}
+
+    def attach(self, observer):
+        self._purge_dead()
+        if observer in self._observers:
+            return
+        super().attach(observer)
+        self._queues[id(observer)] = asyncio.Queue(self._queue_size)
+        self._start(observer)
+
+    def detach(self, observer):
+        super().detach(observer)
+        self._close_queue(id(observer))
+
+    def _close_queue(self, key):
+        queue = self._queues.pop(key, None)
+        if queue is not None:
+            # Mark undelivered items done so drain() does not wait for them
+            while not queue.empty():
+                queue.get_nowait()
+                queue.task_done()
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def _purge_dead(self):
+        while self._dead:
+            self._close_queue(self._dead.popleft())
+
+    def _start(self, observer):
+        # Observers attached before the event loop runs are started on the first publish or drain
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        get_observer = weakref.ref(observer) if self._weak else (lambda: observer)
+        self._tasks[id(observer)] = loop.create_task(self._deliver(get_observer, self._queues[id(observer)]))
+
+    async def _deliver(self, get_observer, queue):
+        while True:
+            news = await queue.get()
+            observer = get_observer()
+            try:
+                if observer is not None:
+                    is_async = inspect.iscoroutinefunction(observer.update)
+                    if self._semaphore is None:
+                        await self._call(observer, news, is_async)
+                    else:
+                        async with self._semaphore:
+                            await self._call(observer, news, is_async)
+            except Exception:
+                logger.exception("Observer %r failed to handle news", observer)
+            finally:
+                observer = None  # Do not keep a weakly held observer alive while waiting for news
+                queue.task_done()
+
+    @staticmethod
+    async def _call(observer, news, is_async):
+        if is_async:
+            await observer.update(news)
+        else:
+            await asyncio.to_thread(observer.update, news)
+
+    # Try to queue news without waiting; returns False when the BLOCK policy needs the caller to wait
+    def _offer(self, observer, queue, news):
+        try:
+            queue.put_nowait(news)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self._overflow is OverflowPolicy.DROP_OLDEST:
+            queue.get_nowait()
+            queue.task_done()
+            queue.put_nowait(news)
+            return True
+        if self._overflow is OverflowPolicy.DISCONNECT:
+            self.detach(observer)
+            return True
+        return False
+
+    def notify(self):
+        self._purge_dead()
+        if len(self._tasks) < len(self._queues):
+            self._start_pending()
+        # With BLOCK, check every queue first so the item reaches all observers or none of them
+        if self._overflow is OverflowPolicy.BLOCK and any(queue.full() for queue in self._queues.values()):
+            raise RuntimeError("Queue is full; use 'await publish()' with the BLOCK overflow policy")
+        for observer in self._observers:
+            self._offer(observer, self._queues[id(observer)], self._latest_news)
+
+    # Awaitable add_news: with the BLOCK policy it waits until every full queue has room
+    async def publish(self, news):
+        self._latest_news = news
+        self._purge_dead()
+        if len(self._tasks) < len(self._queues):
+            self._start_pending()
+        for observer in self._observers:
+            queue = self._queues[id(observer)]
+            if not self._offer(observer, queue, news):
+                await queue.put(news)
+
+    def _start_pending(self):
+        for observer in self._observers:
+            if id(observer) not in self._tasks:
+                self._start(observer)
+
+    # Wait until everything queued so far has been delivered
+    async def drain(self):
+        self._purge_dead()
+        self._start_pending()  # News queued before the loop ran has no delivery task yet
+        await asyncio.gather(*(queue.join() for queue in list(self._queues.values())))
+
+    async def close(self, drain=True):
+        if drain:
+            await self.drain()
+        else:
+            self._purge_dead()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# Topic-based subscriptions: observers subscribe to exact topics ("sports.football") or hierarchical
+# wildcards ("sports.*" matches every topic below "sports", "*" matches everything).
+# add_news(topic, news) only looks up the registries for that topic and its parents, so the cost grows
+# with the number of matching subscribers, not with the total.
+class TopicNewsFeed(NewsFeed):
+    def __init__(self, weak=False):
+        super().__init__(weak)
+        self._weak = weak
+        self._exact = {}
+        self._wildcard = {}  # Prefix -> registry; '' is the "*" subscription
+        self._subscriptions = {}
+        self._latest_topic = None
+
+    def _index_for(self, pattern):
+        if pattern == '*':
+            return self._wildcard, ''
+        if pattern.endswith('.*'):
+            return self._wildcard, pattern[:-2]
+        return self._exact, pattern
+
+    def subscribe(self, observer, pattern='*'):
+        index, key = self._index_for(pattern)
+        registry = index.get(key)
+        if registry is None:
+            on_dead = self._forget_dead(index, key, pattern) if self._weak else None
+            registry = index[key] = ObserverRegistry(self._weak, on_dead)
+        registry.add(observer)
+        self._subscriptions.setdefault(id(observer), set()).add(pattern)
+
+    def unsubscribe(self, observer, pattern='*'):
+        index, key = self._index_for(pattern)
+        registry = index.get(key)
+        if registry is not None:
+            registry.discard(observer)
+            if not registry:
+                del index[key]
+        patterns = self._subscriptions.get(id(observer))
+        if patterns is not None:
+            patterns.discard(pattern)
+            if not patterns:
+                del self._subscriptions[id(observer)]
+
+    # Weak subscriptions: once a subscriber is collected, drop its pattern and the registry if it is now empty
+    def _forget_dead(self, index, key, pattern):
+        subscriptions = self._subscriptions
+        def forget(observer_key):
+            registry = index.get(key)
+            if registry is not None and not registry:
+                del index[key]
+            patterns = subscriptions.get(observer_key)
+            if patterns is not None:
+                patterns.discard(pattern)
+                if not patterns:
+                    del subscriptions[observer_key]
+        return forget
+
+    def attach(self, observer):
+        self.subscribe(observer, '*')
+
+    def detach(self, observer):
+        for pattern in list(self._subscriptions.get(id(observer), ())):
+            self.unsubscribe(observer, pattern)
+
+    def _matching_registries(self, topic):
+        registries = []
+        registry = self._exact.get(topic)
+        if registry is not None:
+            registries.append(registry)
+        if self._wildcard:
+            registry = self._wildcard.get('')
+            if registry is not None:
+                registries.append(registry)
+            # Every parent of "a.b.c" ("a" and "a.b") may have a wildcard subscription
+            dot = topic.find('.')
+            while dot != -1:
+                registry = self._wildcard.get(topic[:dot])
+                if registry is not None:
+                    registries.append(registry)
+                dot = topic.find('.', dot + 1)
+        return registries
+
+    def notify(self):
+        registries = self._matching_registries(self._latest_topic)
+        if len(registries) == 1:
+            for observer in registries[0]:
+                observer.update(self._latest_news)
+            return
+        # An observer matching through several patterns still gets the news once
+        delivered = set()
+        for registry in registries:
+            for observer in registry:
+                if id(observer) not in delivered:
+                    delivered.add(id(observer))
+                    observer.update(self._latest_news)
+
+    def add_news(self, topic, news):
+        self._latest_topic = topic
+        self._latest_news = news
+        self.notify()
+
+
+# Batched delivery: news is buffered until max_batch items are pending or max_delay seconds have passed,
+# then delivered with one update_many(items) call per observer (falling back to repeated update calls).
+# With a key function, a newer item with the same key replaces the pending one instead of being queued too.
+class BatchingNewsFeed(NewsFeed):
+    def __init__(self, max_batch=1000, max_delay=0.1, key=None, weak=False):
+        super().__init__(weak)
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._key = key
+        self._pending = {} if key else []
+        self._timer = None
+        self._lock = threading.Lock()
+        # Keeps batches in order when flushes race. Reentrant, because an observer may publish (and fill
+        # a batch) from inside update; that batch is left pending and delivered by the running flush.
+        self._delivery_lock = threading.RLock()
+        self._delivering = False
+
+    def add_news(self, news):
+        with self._lock:
+            self._latest_news = news
+            if self._key is None:
+                self._pending.append(news)
+            else:
+                key = self._key(news)
+                self._pending.pop(key, None)  # The superseded item is dropped, the new one goes last
+                self._pending[key] = news
+            if self._timer is None and self._max_delay is not None:
+                self._timer = threading.Timer(self._max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            full = len(self._pending) >= self._max_batch
+        if full:
+            self.flush()
+
+    def notify(self):
+        self.flush()
+
+    def flush(self):
+        with self._delivery_lock:
+            if self._delivering:
+                return
+            self._delivering = True
+            try:
+                while self._deliver_pending():
+                    pass
+            finally:
+                self._delivering = False
+
+    # Deliver one batch; returns False when nothing was pending
+    def _deliver_pending(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return False
+            items = list(self._pending.values()) if self._key else self._pending
+            self._pending = {} if self._key else []
+        for observer in self._observers:
+            update_many = getattr(observer, 'update_many', None)
+            if update_many is not None:
+                update_many(items)
+            else:
+                for news in items:
+                    observer.update(news)
+        return True
+
+
+# Thread-pool delivery for observers whose update does blocking I/O.
+# Each observer has its own mailbox that is drained by at most one pool task at a time, so an observer
+# always sees news in publish order while different observers are served in parallel.
+# A detached mailbox is kept until its running drain finishes, so re-attaching reuses it instead of
+# starting a second, concurrent drain for the same observer.
+class Mailbox:
+    __slots__ = ('key', 'get_observer', 'items', 'lock', 'scheduled', 'detached')
+
+    def __init__(self, observer, weak=False):
+        self.key = id(observer)
+        self.get_observer = weakref.ref(observer) if weak else (lambda: observer)
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.scheduled = False
+        self.detached = False
+
+
+class ThreadPoolNewsFeed(NewsFeed):
+    def __init__(self, executor=None, max_workers=None, batch_size=64, weak=False):
+        super().__init__(weak)
+        self._weak = weak
+        # Ids of collected observers; cleaned up lazily, since the GC callback may run while a lock is held
+        self._dead = deque()
+        self._observers = ObserverRegistry(weak, self._dead.append)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers, thread_name_prefix='newsfeed')
+        self._batch_size = batch_size  # Items delivered before a busy mailbox gives its worker back
+        self._mailboxes = {}
+        self._mailboxes_lock = threading.Lock()  # Taken before any mailbox lock
+        self._running = 0
+        self._idle = threading.Condition()
+
+    def attach(self, observer):
+        self._purge_dead()
+        with self._mailboxes_lock:
+            mailbox = self._mailboxes.get(id(observer))
+            # A mailbox under the same id may still belong to a collected observer whose drain is finishing
+            if mailbox is None or mailbox.get_observer() is not observer:
+                self._mailboxes[id(observer)] = Mailbox(observer, self._weak)
+            else:
+                with mailbox.lock:
+                    mailbox.detached = False
+        super().attach(observer)
+
+    def detach(self, observer):
+        super().detach(observer)
+        self._close_mailbox(id(observer))
+
+    def _purge_dead(self):
+        while self._dead:
+            key = self._dead.popleft()
+            mailbox = self._mailboxes.get(key)
+            if mailbox is not None and mailbox.get_observer() is None:
+                self._close_mailbox(key)
+
+    def _close_mailbox(self, key):
+        with self._mailboxes_lock:
+            mailbox = self._mailboxes.get(key)
+            if mailbox is None:
+                return
+            with mailbox.lock:
+                mailbox.items.clear()
+                mailbox.detached = True
+                if not mailbox.scheduled:
+                    del self._mailboxes[key]
+
+    # Publishers may run in parallel (e.g. on free-threaded builds), so the item is handed straight to the
+    # mailboxes instead of going through the shared _latest_news
+    def add_news(self, news):
+        self._latest_news = news
+        self._publish(news)
+
+    def notify(self):
+        self._publish(self._latest_news)
+
+    def _publish(self, news):
+        self._purge_dead()
+        for observer in self._observers:
+            mailbox = self._mailboxes.get(id(observer))
+            if mailbox is None:
+                continue
+            with mailbox.lock:
+                if mailbox.detached:
+                    continue
+                mailbox.items.append(news)
+                if mailbox.scheduled:
+                    continue
+                mailbox.scheduled = True
+            with self._idle:
+                self._running += 1
+            self._executor.submit(self._drain, mailbox)
+
+    def _drain(self, mailbox):
+        for _ in range(self._batch_size):
+            with mailbox.lock:
+                if not mailbox.items:
+                    mailbox.scheduled = False
+                    retire = mailbox.detached
+                    break
+                news = mailbox.items.popleft()
+            observer = mailbox.get_observer()
+            if observer is None:
+                continue
+            try:
+                observer.update(news)
+            except Exception:
+                logger.exception("Observer %r failed to handle news", observer)
+            observer = None
+        else:
+            # Still busy: requeue behind other observers' work instead of holding on to this worker
+            self._executor.submit(self._drain, mailbox)
+            return
+        if retire:
+            self._retire(mailbox)
+        with self._idle:
+            self._running -= 1
+            if not self._running:
+                self._idle.notify_all()
+
+    # Forget a detached mailbox once nothing is draining it, unless it was re-attached meanwhile
+    def _retire(self, mailbox):
+        with self._mailboxes_lock:
+            with mailbox.lock:
+                if mailbox.detached and not mailbox.scheduled and self._mailboxes.get(mailbox.key) is mailbox:
+                    del self._mailboxes[mailbox.key]
+
+    # Block until every published item has been delivered
+    def join(self, timeout=None):
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._running, timeout)
+
+    def shutdown(self, wait=True):
+        if wait:
+            self.join()
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+
 # Step 5: Client Code
 def main():
     # Create a news feed
@@ -86,5 +598,13 @@ def main():
     # Add more news
     news_feed.add_news("Important update: Tax season extension!")
 
+    # Subscribe to categories instead of receiving everything
+    topic_feed = TopicNewsFeed()
+    topic_feed.subscribe(user1, "sports.*")
+    topic_feed.subscribe(user2, "politics")
+
+    topic_feed.add_news("sports.football", "Local team wins the cup!")  # Only Alice
+    topic_feed.add_news("politics", "Elections announced for spring.")  # Only Bob
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,6 +8,18 @@
 # This abstract class defines the actions available across all states.
 
 from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import mmap
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the transition engine falls back to a plain table loop
+    np = None
 
 class State(ABC):
     @abstractmethod
@@ -21,24 +33,32 @@ class State(ABC):
 
 # Step 2: Concrete States
 # Each class represents a specific state and implements the behavior for that state.
+# The states hold no per-document data, so one shared (flyweight) instance of each is reused for every
+# document and transition. `code` is the small integer used by the compact DocumentStore.
 class Draft(State):
+    code = 0
+
     def publish(self, document):
         print("Draft: Moving to moderation for review.")
-        document.state = Moderation()  # Transition to Moderation
+        document.state = MODERATION  # Transition to Moderation
 
     def reject(self, document):
         print("Draft: Cannot reject a draft. It's not submitted yet.")
 
 class Moderation(State):
+    code = 1
+
     def publish(self, document):
         print("Moderation: Approved! Publishing document.")
-        document.state = Published()  # Transition to Published
+        document.state = PUBLISHED  # Transition to Published
 
     def reject(self, document):
         print("Moderation: Rejected. Sending back to draft.")
-        document.state = Draft()  # Transition back to Draft
+        document.state = DRAFT  # Transition back to Draft
 
 class Published(State):
+    code = 2
+
     def publish(self, document):
         print("Published: Already published. Nothing to do.")
 
@@ -46,11 +66,97 @@ class Published(State):
         print("Published: Cannot reject. Unpublishing requires different logic.")
 
 
+DRAFT = Draft()
+MODERATION = Moderation()
+PUBLISHED = Published()
+STATES = (DRAFT, MODERATION, PUBLISHED)  # Indexed by State.code
+
+
 # Step 3. The Context
 # This is the main object (the Document) that holds a reference to the current state. It delegates the work to the state object.
 class Document:
     def __init__(self):
-        self.state = Draft(self)
+        self.state = DRAFT
+
+    def publish(self):
+        self.state.publish(self)
+
+    def reject(self):
+        self.state.reject(self)
+
+    def set_state(self, state):
+        self.state = state
+
+
+# Compact storage for many documents: the state of each document is one byte in an array instead of
+# a state object per document. StoredDocument is a lightweight handle that behaves like a Document.
+class DocumentStore:
+    def __init__(self):
+        self._codes = array('B')
+
+    def create(self):
+        self._codes.append(DRAFT.code)
+        return StoredDocument(self, len(self._codes) - 1)
+
+    def create_many(self, count):
+        first_id = len(self._codes)
+        self._codes.frombytes(bytes([DRAFT.code]) * count)
+        return range(first_id, first_id + count)
+
+    def document(self, document_id):
+        if not 0 <= document_id < len(self._codes):
+            raise IndexError("Unknown document id")
+        return StoredDocument(self, document_id)
+
+    def get_state(self, document_id):
+        return STATES[self._codes[document_id]]
+
+    def set_state(self, document_id, state):
+        self._codes[document_id] = state.code
+
+    # Bulk access used by the TransitionEngine
+    def read_codes(self, document_ids):
+        self._check_ids(document_ids)
+        if np is not None:
+            return np.frombuffer(self._codes, dtype=np.uint8)[np.asarray(document_ids, dtype=np.intp)]
+        return array('B', [self._codes[document_id] for document_id in document_ids])
+
+    def write_codes(self, document_ids, codes):
+        self._check_ids(document_ids)
+        if np is not None:
+            np.frombuffer(self._codes, dtype=np.uint8)[np.asarray(document_ids, dtype=np.intp)] = codes
+            return
+        for document_id, code in zip(document_ids, codes):
+            self._codes[document_id] = code
+
+    def _check_ids(self, document_ids):
+        if not len(document_ids):
+            return
+        if np is not None and isinstance(document_ids, np.ndarray):
+            low, high = document_ids.min(), document_ids.max()
+        else:
+            low, high = min(document_ids), max(document_ids)
+        if low < 0 or high >= len(self._codes):
+            raise IndexError("Unknown document id")
+
+    def __len__(self):
+        return len(self._codes)
+
+
+class StoredDocument:
+    __slots__ = ('_store', 'id')
+
+    def __init__(self, store, document_id):
+        self._store = store
+        self.id = document_id
+
+    @property
+    def state(self):
+        return self._store.get_state(self.id)
+
+    @state.setter
+    def state(self, state):
+        self._store.set_state(self.id, state)
 
     def publish(self):
         self.state.publish(self)
@@ -62,6 +168,328 @@ class Document:
         self.state = state
 
 
+# Table-driven bulk transitions.
+# The state classes are compiled once into a transition table (next state code for every state and event),
+# then batches of (document_id, event) pairs are applied with table lookups instead of method calls and prints.
+PUBLISH = 0
+REJECT = 1
+EVENTS = ('publish', 'reject')  # Indexed by event code
+
+
+def compile_transition_table(states=STATES):
+    # Run every event once in every state against a probe document, with the messages suppressed
+    table = bytearray()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for state in states:
+            for event in EVENTS:
+                probe = Document()
+                probe.state = state
+                getattr(probe, event)()
+                table.append(probe.state.code)
+    return bytes(table)
+
+
+class TransitionReport:
+    def __init__(self, total, noops):
+        self.total = total
+        self.noops = noops  # Positions in the batch of events that left the document's state unchanged
+
+    @property
+    def applied(self):
+        return self.total - len(self.noops)
+
+    def __repr__(self):
+        return f"TransitionReport(applied={self.applied}, noops={len(self.noops)})"
+
+
+# Map document ids to dense local indexes: returns (unique ids, local index of every event)
+def _localize(document_ids):
+    if np is not None:
+        return np.unique(np.asarray(document_ids, dtype=np.int64), return_inverse=True)
+    local_of = {}
+    local_ids = array('q', [local_of.setdefault(document_id, len(local_of)) for document_id in document_ids])
+    return list(local_of), local_ids
+
+
+def _check_events(events):
+    if not len(events):
+        return
+    if np is not None and isinstance(events, np.ndarray):
+        low, high = events.min(), events.max()
+    else:
+        low, high = min(events), max(events)
+    if low < 0 or high >= len(EVENTS):
+        raise ValueError("Unknown event code")
+
+
+# Apply events to `codes` (one code per local document) in place and return the positions of no-op events
+def _run_transitions(table, codes, local_ids, events):
+    width = len(EVENTS)
+    if np is not None:
+        events = np.asarray(events, dtype=np.intp)
+    _check_events(events)
+    if np is None:
+        noops = array('q')
+        for position, (local_id, event) in enumerate(zip(local_ids, events)):
+            current = codes[local_id]
+            new = table[current * width + event]
+            if new == current:
+                noops.append(position)
+            else:
+                codes[local_id] = new
+        return noops
+
+    # Vectorized: the k-th event of every document is applied in the same round, so events for one
+    # document still run in order while all documents advance together
+    local_ids = np.asarray(local_ids, dtype=np.intp)
+    events = np.asarray(events, dtype=np.intp)
+    table = np.frombuffer(table, dtype=np.uint8)
+    order = np.argsort(local_ids, kind='stable')
+    sorted_ids = local_ids[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = sorted_ids[1:] != sorted_ids[:-1]
+    positions = np.arange(len(order))
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+    noop = np.zeros(len(order), dtype=bool)
+    by_round = np.argsort(rank, kind='stable')
+    bounds = np.searchsorted(rank[by_round], np.arange(rank.max() + 2 if len(rank) else 1))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        batch = by_round[start:stop]
+        targets = local_ids[batch]
+        current = codes[targets]
+        new = table[current.astype(np.intp) * width + events[batch]]
+        noop[batch] = new == current
+        codes[targets] = new
+    return np.flatnonzero(noop)
+
+
+# Worker side of apply_parallel: localize and transition one partition. `codes` holds the current state code
+# of the document of every event, so a worker receives only the codes its own events touch.
+# Returns the ids and new codes of the documents that changed, and the no-op positions within the partition.
+def _apply_partition(table, document_ids, events, codes):
+    if np is not None:
+        unique_ids, first, local_ids = np.unique(np.asarray(document_ids, dtype=np.int64),
+                                                 return_index=True, return_inverse=True)
+        before = np.asarray(codes, dtype=np.uint8)[first]
+        after = before.copy()
+        noops = _run_transitions(table, after, local_ids, events)
+        changed = np.flatnonzero(before != after)
+        return unique_ids[changed], after[changed], noops
+    local_of = {}
+    local_ids = array('q')
+    before = array('B')
+    for document_id, code in zip(document_ids, codes):
+        local_id = local_of.get(document_id)
+        if local_id is None:
+            local_id = local_of[document_id] = len(local_of)
+            before.append(code)
+        local_ids.append(local_id)
+    unique_ids = list(local_of)
+    after = array('B', before)
+    noops = _run_transitions(table, after, local_ids, events)
+    changed = [index for index in range(len(unique_ids)) if before[index] != after[index]]
+    return [unique_ids[index] for index in changed], [after[index] for index in changed], noops
+
+
+class TransitionEngine:
+    def __init__(self, store: DocumentStore, states=STATES):
+        self.store = store
+        self.states = states
+        self.table = compile_transition_table(states)
+
+    def _prepare(self, document_ids):
+        unique_ids, local_ids = _localize(document_ids)
+        codes = self.store.read_codes(unique_ids)
+        return unique_ids, local_ids, codes
+
+    def _commit(self, unique_ids, before, after):
+        if np is not None:
+            changed = np.flatnonzero(np.asarray(before) != np.asarray(after))
+            if len(changed):
+                self.store.write_codes(unique_ids[changed], np.asarray(after)[changed])
+            return
+        changed = [index for index in range(len(unique_ids)) if before[index] != after[index]]
+        if changed:
+            self.store.write_codes([unique_ids[index] for index in changed], [after[index] for index in changed])
+
+    def apply(self, document_ids, events) -> TransitionReport:
+        unique_ids, local_ids, before = self._prepare(document_ids)
+        after = before.copy() if np is not None else array('B', before)
+        noops = _run_transitions(self.table, after, local_ids, events)
+        self._commit(unique_ids, before, after)
+        return TransitionReport(len(events), list(noops))
+
+    # Split a batch by document id so each partition can be applied independently, keeping per-document order.
+    # Returns, for each partition, the positions of its events in the original batch.
+    @staticmethod
+    def partition(document_ids, partitions):
+        if np is not None:
+            owners = np.asarray(document_ids, dtype=np.int64) % partitions
+            order = np.argsort(owners, kind='stable')
+            bounds = np.cumsum(np.bincount(owners, minlength=partitions))
+            return np.split(order, bounds[:-1])
+        buckets = [[] for _ in range(partitions)]
+        for position, document_id in enumerate(document_ids):
+            buckets[document_id % partitions].append(position)
+        return buckets
+
+    # The parent only partitions the batch and writes back the changed codes in one call;
+    # localizing, reading and transitioning happen in the workers.
+    def apply_parallel(self, document_ids, events, processes=None) -> TransitionReport:
+        processes = processes or os.cpu_count()
+        if np is not None:
+            document_ids = np.asarray(document_ids, dtype=np.int64)
+            events = np.asarray(events, dtype=np.intp)
+        _check_events(events)
+        event_codes = self.store.read_codes(document_ids)  # One gather for the whole batch; also checks the ids
+        jobs = []
+        with ProcessPoolExecutor(processes) as pool:
+            for positions in self.partition(document_ids, processes):
+                if not len(positions):
+                    continue
+                if np is not None:
+                    ids, partition_events, codes = document_ids[positions], events[positions], event_codes[positions]
+                else:
+                    ids = [document_ids[position] for position in positions]
+                    partition_events = [events[position] for position in positions]
+                    codes = array('B', [event_codes[position] for position in positions])
+                jobs.append((positions, pool.submit(_apply_partition, self.table, ids, partition_events, codes)))
+            results = [(positions, future.result()) for positions, future in jobs]
+
+        if np is not None:
+            if results:
+                self.store.write_codes(np.concatenate([changed_ids for _, (changed_ids, _, _) in results]),
+                                       np.concatenate([codes for _, (_, codes, _) in results]))
+            noops = np.sort(np.concatenate([positions[noops] for positions, (_, _, noops) in results]
+                                           or [np.empty(0, dtype=np.intp)])).tolist()
+            return TransitionReport(len(events), noops)
+        changed_ids, changed_codes, noops = [], [], []
+        for positions, (ids, codes, partition_noops) in results:
+            changed_ids.extend(ids)
+            changed_codes.extend(codes)
+            noops.extend(positions[noop] for noop in partition_noops)
+        if changed_ids:
+            self.store.write_codes(changed_ids, changed_codes)
+        noops.sort()
+        return TransitionReport(len(events), noops)
+
+
+# Durable DocumentStore: every state change is appended to a binary transition log, and a compact snapshot
+# of all state codes is written every `snapshot_every` log records. Recovery loads the latest snapshot and
+# replays only the log records written after it, read through mmap, so restart time is bounded by the
+# snapshot interval rather than by the whole history.
+class JournaledDocumentStore(DocumentStore):
+    RECORD = struct.Struct('<QB')  # document id, new state code
+    CREATE = 0xFF  # Record code meaning "the store now holds <document id> documents"
+    SNAPSHOT = struct.Struct('<4sQQ')  # magic, log offset covered by the snapshot, document count
+    MAGIC = b'DSS1'
+
+    def __init__(self, directory, snapshot_every=1_000_000):
+        super().__init__()
+        self.snapshot_every = snapshot_every
+        self._log_path = os.path.join(directory, 'transitions.log')
+        self._snapshot_path = os.path.join(directory, 'snapshot.bin')
+        os.makedirs(directory, exist_ok=True)
+        stale_snapshot = self._recover()
+        self._log = open(self._log_path, 'ab')
+        self._since_snapshot = 0
+        if stale_snapshot:
+            # Re-anchor the snapshot at the end of the shortened log so new records are not skipped on replay
+            self.snapshot()
+
+    # Returns True when the snapshot records a log offset past the end of the log
+    def _recover(self):
+        offset = 0
+        try:
+            with open(self._snapshot_path, 'rb') as f:
+                magic, offset, count = self.SNAPSHOT.unpack(f.read(self.SNAPSHOT.size))
+                if magic != self.MAGIC:
+                    raise ValueError("Not a document store snapshot")
+                self._codes.fromfile(f, count)
+        except FileNotFoundError:
+            pass
+
+        if not os.path.exists(self._log_path):
+            return offset > 0
+        with open(self._log_path, 'r+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Log records lost after the snapshot was made durable are already part of the snapshot
+            if size < offset:
+                return True
+            # A crash can leave a partially written record at the end; drop it
+            end = offset + (size - offset) // self.RECORD.size * self.RECORD.size
+            if end > offset:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                    self._replay(memoryview(log)[offset:end])
+            if end != size:
+                f.truncate(end)
+        return False
+
+    def _replay(self, records):
+        codes = self._codes
+        try:
+            for document_id, code in self.RECORD.iter_unpack(records):
+                if code == self.CREATE:
+                    codes.frombytes(bytes([DRAFT.code]) * (document_id - len(codes)))
+                else:
+                    codes[document_id] = code
+        finally:
+            records.release()
+
+    def _append(self, data, records):
+        self._log.write(data)
+        self._since_snapshot += records
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def create(self):
+        return StoredDocument(self, self.create_many(1)[0])
+
+    def create_many(self, count):
+        document_ids = super().create_many(count)
+        self._append(self.RECORD.pack(len(self._codes), self.CREATE), 1)
+        return document_ids
+
+    def set_state(self, document_id, state):
+        super().set_state(document_id, state)
+        self._append(self.RECORD.pack(document_id, state.code), 1)
+
+    def write_codes(self, document_ids, codes):
+        super().write_codes(document_ids, codes)
+        pack = self.RECORD.pack
+        self._append(b''.join(pack(int(document_id), int(code)) for document_id, code in zip(document_ids, codes)),
+                     len(document_ids))
+
+    def snapshot(self):
+        # The log must be durable up to the offset the snapshot records
+        self.sync(fsync=True)
+        tmp_path = self._snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.SNAPSHOT.pack(self.MAGIC, self._log.tell(), len(self._codes)))
+            self._codes.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        self._since_snapshot = 0
+
+    # Flush buffered log records; with fsync=True they also survive a power loss
+    def sync(self, fsync=False):
+        self._log.flush()
+        if fsync:
+            os.fsync(self._log.fileno())
+
+    def close(self):
+        self.sync()
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 # Step 4. Client Code
 def main():
     my_doc = Document()
@@ -88,5 +516,17 @@ def main():
     my_doc.publish()
     # Output: Published: Already published. Nothing to do.
 
+    # 5. Many documents share the same state objects and live in a compact store
+    store = DocumentStore()
+    stored_doc = store.create()
+    stored_doc.publish()  # Moves to Moderation
+    print(f"Stored document {stored_doc.id}: {type(stored_doc.state).__name__}")
+
+    # 6. Replay a batch of moderation events without a method call or print per event
+    engine = TransitionEngine(store)
+    document_ids = list(store.create_many(3))
+    report = engine.apply(document_ids + document_ids + [stored_doc.id], [PUBLISH, REJECT, PUBLISH, PUBLISH, PUBLISH, PUBLISH, PUBLISH])
+    print(report)  # Output: TransitionReport(applied=6, noops=1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file